@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, send_file, abort, redirect
 from flask_cors import CORS
 import sys, os, json
 from pathlib import Path
@@ -7,19 +7,29 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from scripts import rag_core
 from scripts.rag_core import ConversationManager, SYSTEM_PROMPT
 from scripts.pose_image_retriever import PoseImageRetriever
+from scripts.request_coalescer import RequestCoalescer, normalize_query
+from scripts.pose_cache import PoseResultCache
+from scripts.asset_variants import AssetVariants
 
 app = Flask(__name__, static_url_path='/static', static_folder='static')
 CORS(app)
 
 conv_manager = ConversationManager(SYSTEM_PROMPT)
 retriever = PoseImageRetriever(db_path='images_db.json', base_dir='static')
+# Concurrent identical questions share one pipeline run instead of each calling Fanar.
+rag_coalescer = RequestCoalescer()
+asset_variants = AssetVariants()
 
 import cv2
-import uuid
+import hashlib
+import numpy as np
 import mediapipe as mp
 
 import math
 
+POSE_MAX_SIDE = 640  # uploads are downscaled to this before inference; landmarks are resolution-independent
+pose_cache = PoseResultCache(os.path.join('static', 'pose_cache'), '/static/pose_cache')
+
 def calculate_angle(a, b, c):
     """Calculate angle between 3 points (in degrees)"""
     a = [a.x, a.y]
@@ -35,19 +45,33 @@ def calculate_angle(a, b, c):
     return angle
 
 
+def fit_to_working_resolution(img, max_side=POSE_MAX_SIDE):
+    """Downscale so the longest side is at most max_side; smaller images are left as they are."""
+    height, width = img.shape[:2]
+    scale = max_side / float(max(height, width))
+    if scale >= 1.0:
+        return img
+    return cv2.resize(img, (int(round(width * scale)), int(round(height * scale))), interpolation=cv2.INTER_AREA)
+
+
 @app.route('/check_pose', methods=['POST'])
 def check_pose():
     if 'image' not in request.files:
         return jsonify({'message': 'No image uploaded'}), 400
 
-    file = request.files['image']
-    filename = f"{uuid.uuid4().hex}.jpg"
-    filepath = os.path.join('static', filename)
-    file.save(filepath)
+    # Decode straight from the request bytes; nothing is written to disk unless
+    # an overlay is produced, and repeated uploads are served from the cache.
+    image_bytes = request.files['image'].read()
+    image_key = hashlib.sha256(image_bytes).hexdigest()
+    cached = pose_cache.get(image_key)
+    if cached is not None:
+        print(f"[DEBUG] Pose cache hit: {image_key[:12]}")
+        return jsonify(cached)
 
-    img = cv2.imread(filepath)
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR) if image_bytes else None
     if img is None:
         return jsonify({'message': 'Invalid image'}), 400
+    img = fit_to_working_resolution(img)
 
     mp_pose = mp.solutions.pose
     mp_drawing = mp.solutions.drawing_utils
@@ -56,7 +80,7 @@ def check_pose():
         results = pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
 
         if not results.pose_landmarks:
-            return jsonify({'message': 'No person detected in the image.'})
+            return jsonify(pose_cache.put(image_key, 'No person detected in the image.'))
 
         landmarks = results.pose_landmarks.landmark
 
@@ -76,18 +100,41 @@ def check_pose():
         # Draw pose landmarks on the image
         mp_drawing.draw_landmarks(img, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
 
-        # Save overlay image
-        overlay_path = os.path.join('static', 'pose_' + filename)
-        cv2.imwrite(overlay_path, img)
+    # Encode the overlay in memory; the cache writes it and evicts old overlays.
+    ok, overlay = cv2.imencode('.jpg', img)
+    if not ok:
+        return jsonify({'message': feedback})
+
+    return jsonify(pose_cache.put(image_key, feedback, overlay.tobytes()))
 
-    # Optionally, remove original file to keep folder clean
-    # os.remove(filepath)
 
-    return jsonify({
-        'message': feedback,
-        'image_path': f'/static/pose_{filename}'
-    })
 
+@app.route('/media/<path:name>')
+def media(name):
+    """Serve the best pre-generated variant of an image_output picture for the client's Accept header."""
+    size = request.args.get('size', 'full')
+    picked = asset_variants.negotiate(name, request.headers.get('Accept', ''), size)
+    if picked is None:
+        abort(404)
+    path, mimetype, etag, version = picked
+
+    # A stale ?v= names content that no longer exists; send the client to the current version.
+    requested_version = request.args.get('v')
+    if requested_version is not None and requested_version != version:
+        return redirect(asset_variants.url_for(name, size) or asset_variants.url_for(name))
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=False, etag=False)
+    response.set_etag(etag)
+    if requested_version is not None:
+        # The URL carries the content hash, so the response never changes for it.
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept'
+    return response
 
 
 def format_sse(data: str, event: str = 'message') -> str:
@@ -126,12 +173,15 @@ def ask_rag():
 
     def generate():
         if image_path:
-            image_url = f"/static/{image_path}"
+            image_url = asset_variants.url_for(image_path) or f"/static/{image_path}"
             msg = {
                 "type": "bot_response",
                 "message": "Here is the pose visualization you requested.",
                 "image_path": image_url
             }
+            thumbnail_url = asset_variants.url_for(image_path, size="thumb")
+            if thumbnail_url:
+                msg["thumbnail_path"] = thumbnail_url
             print(f"[DEBUG] Sending visualization response: {msg}")  # ✅
             yield format_sse(json.dumps(msg))
             save_chat_log(query, msg["message"])
@@ -142,7 +192,13 @@ def ask_rag():
         full_response = ""
         try:
             print(f"[DEBUG] Calling run_rag_pipeline for query: {query}")  # ✅
-            for message_json_str in rag_core.run_rag_pipeline(query, conv_manager):
+            # Resolve once so the flight key and the pipeline use the same language decision.
+            languages = rag_core.resolve_query_languages(query)
+            flight_key = (normalize_query(query), languages[1])
+            pipeline_stream = rag_coalescer.stream(
+                flight_key, lambda: rag_core.run_rag_pipeline(query, conv_manager, languages)
+            )
+            for message_json_str in pipeline_stream:
                 print(f"[DEBUG] Received RAG chunk: {message_json_str}")  # ✅
                 try:
                     message = json.loads(message_json_str)
@@ -181,8 +237,12 @@ if __name__ == '__main__':
     print("Pre-loading RAG core components...")
     try:
         rag_core._load_embedder()
-        rag_core._load_vector_db()
+        rag_core._load_vector_db(preload=True)
         load_chat_history_from_logs()
+        try:
+            asset_variants.rebuild()
+        except Exception as e:
+            print(f"[WARN] Could not build image variants, serving originals: {e}")
         print("Starting Flask app...")
     except Exception as e:
         print(f"Fatal error during RAG core pre-loading: {e}")
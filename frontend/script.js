@@ -125,6 +125,10 @@ async function sendMessage(textFromSuggested = null) {
     const reader = response.body.getReader();
     const decoder = new TextDecoder();
     let buffer = '';
+    // Translated bullets arrive as 'partial' events in completion order;
+    // they are shown in answer order until the final bot_response replaces them.
+    let partialDiv = null;
+    let partialLines = [];
 
     while (true) {
       const { value, done } = await reader.read();
@@ -148,19 +152,37 @@ async function sendMessage(textFromSuggested = null) {
         if (jsonStr) {
           try {
             const data = JSON.parse(jsonStr);
-            if (data.type === 'bot_response') {
+            if (data.type === 'partial') {
+              if (!partialDiv) {
+                partialDiv = appendMessageToWindow('bot', '');
+                partialLines = new Array(data.total).fill('');
+              }
+              partialLines[data.index] = data.message;
+              partialDiv.innerText = partialLines.filter(Boolean).join('\n');
+              chatWindow.scrollTop = chatWindow.scrollHeight;
+            } else if (data.type === 'bot_response') {
+              if (partialDiv) {
+                partialDiv.remove();
+                partialDiv = null;
+              }
               appendBotMessage(data.message);
 
               if (data.image_path) {
                 const lastBotMsg = document.querySelector('.bot-message:last-child');
                 if (lastBotMsg) {
+                  // Show the small variant inline; the full-size image opens on click.
+                  const link = document.createElement('a');
+                  link.href = data.image_path;
+                  link.target = '_blank';
                   const img = document.createElement('img');
-                  img.src = data.image_path;
+                  img.src = data.thumbnail_path || data.image_path;
                   img.alt = 'Pose Visualization';
+                  img.loading = 'lazy';
                   img.style.maxWidth = '300px';
                   img.style.marginTop = '8px';
                   img.style.borderRadius = '8px';
-                  lastBotMsg.appendChild(img);
+                  link.appendChild(img);
+                  lastBotMsg.appendChild(link);
                   chatWindow.scrollTop = chatWindow.scrollHeight;
                 }
               }
@@ -1,78 +1,97 @@
-import os
-import json
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document
-from langchain_huggingface import HuggingFaceEmbeddings
-
-# --- Configuration ---
-PDF_DIR = 'Articles_for_rag'  # Folder with your PDFs
-INDEX_DIR = "vector2_db"  # Output FAISS index folder
-CHUNK_SIZE = 500
-CHUNK_OVERLAP = 50
-
-# --- Helper: Extract title, author, year from filename ---
-def parse_metadata(fname):
-    base = fname.replace(".pdf", "")
-    parts = [p.strip() for p in base.split(",")]
-    title = parts[0] if len(parts) > 0 else "Unknown"
-    author_name = parts[1]
-    year = str(parts[2]) if len(parts) > 2 and parts[2].isdigit() else "2024"
-    author = [{"name": author_name}]
-    print(author)
-    print(type(author_name))
-    return title, author, year
-
-# --- Step 1: Load PDFs and assign metadata ---
-all_docs = []
-corpus_id_map = {}
-
-for i, fname in enumerate(os.listdir(PDF_DIR)):
-    if not fname.endswith(".pdf"):
-        continue
-
-    print(f"🔍 Loading: {fname}")
-    path = os.path.join(PDF_DIR, fname)
-    loader = PyPDFLoader(path)
-    pages = loader.load()
-
-    title, author, year = parse_metadata(fname)
-    corpus_id = str(i)
-    corpus_id_map[corpus_id] = f"{title}, {author[0]['name'] if author else 'Unknown'}, {year}"
-
-    for page in pages:
-        page.metadata = {
-            "corpus_id": corpus_id,
-            "title": title,
-            "authors": author,
-            "year": year,
-            "abstract": ""
-        }
-
-    all_docs.extend(pages)
-
-print(f"✅ Loaded {len(all_docs)} total pages from {len(corpus_id_map)} PDFs")
-
-# --- Step 2: Split into chunks ---
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=CHUNK_SIZE,
-    chunk_overlap=CHUNK_OVERLAP
-)
-
-chunks = splitter.split_documents(all_docs)
-print(f"🧩 Created {len(chunks)} chunks")
-
-# --- Step 3: Embed using HuggingFace ---
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-# --- Step 4: Create FAISS index ---
-vectorstore = FAISS.from_documents(chunks, embedding_model)
-
-# --- Step 5: Save index and corpus map ---
-vectorstore.save_local(INDEX_DIR)
-
-with open(os.path.join(INDEX_DIR, "corpus_id_map.json"), "w") as f:
-    json.dump(corpus_id_map, f, indent=2)
-
-print(f"✅ Saved FAISS index to '{INDEX_DIR}' with {len(chunks)} chunks")
+import os
+import json
+from langchain_community.vectorstores import FAISS
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_huggingface import HuggingFaceEmbeddings
+from scripts.near_dedup import collapse_near_duplicates, format_stats
+from scripts.page_cache import load_pdf_pages
+
+# --- Configuration ---
+PDF_DIR = 'Articles_for_rag'  # Folder with your PDFs
+INDEX_DIR = "vector2_db"  # Output FAISS index folder
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+DEDUP_THRESHOLD = 0.8  # estimated Jaccard similarity above which chunks are collapsed (None to disable)
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# --- Helper: Extract title, author, year from filename ---
+def parse_metadata(fname):
+    base = fname.replace(".pdf", "")
+    parts = [p.strip() for p in base.split(",")]
+    title = parts[0] if len(parts) > 0 else "Unknown"
+    author_name = parts[1]
+    year = str(parts[2]) if len(parts) > 2 and parts[2].isdigit() else "2024"
+    author = [{"name": author_name}]
+    print(author)
+    print(type(author_name))
+    return title, author, year
+
+# --- Step 1: Load PDFs (page text cached by file hash) and assign metadata ---
+def load_corpus_pages(pdf_dir=PDF_DIR):
+    all_docs = []
+    corpus_id_map = {}
+    cache_hits = 0
+
+    for i, fname in enumerate(os.listdir(pdf_dir)):
+        if not fname.endswith(".pdf"):
+            continue
+
+        print(f"🔍 Loading: {fname}")
+        path = os.path.join(pdf_dir, fname)
+        pages, cache_hit = load_pdf_pages(path)
+        cache_hits += cache_hit
+
+        title, author, year = parse_metadata(fname)
+        corpus_id = str(i)
+        corpus_id_map[corpus_id] = f"{title}, {author[0]['name'] if author else 'Unknown'}, {year}"
+
+        for page in pages:
+            page.metadata = {
+                "corpus_id": corpus_id,
+                "title": title,
+                "authors": author,
+                "year": year,
+                "abstract": "",
+                "page": page.metadata.get("page")
+            }
+
+        all_docs.extend(pages)
+
+    print(f"✅ Loaded {len(all_docs)} total pages from {len(corpus_id_map)} PDFs ({cache_hits} from the page cache)")
+    return all_docs, corpus_id_map
+
+# --- Step 2: Split into chunks and collapse near-duplicates ---
+def make_chunks(all_docs, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, dedup_threshold=DEDUP_THRESHOLD):
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+    chunks = splitter.split_documents(all_docs)
+    print(f"🧩 Created {len(chunks)} chunks (size={chunk_size}, overlap={chunk_overlap})")
+
+    # Overlapping sources and chunk overlap leave many near-identical chunks.
+    if dedup_threshold is not None:
+        chunks, dedup_stats = collapse_near_duplicates(chunks, threshold=dedup_threshold)
+        print(f"🧹 Near-duplicate pass: {format_stats(dedup_stats)}")
+
+    return chunks
+
+# --- Steps 3-5: Embed, build the FAISS index and save it with the corpus map ---
+def build_index(chunks, embedding_model, index_dir=INDEX_DIR, corpus_id_map=None):
+    vectorstore = FAISS.from_documents(chunks, embedding_model)
+    vectorstore.save_local(index_dir)
+
+    if corpus_id_map is not None:
+        with open(os.path.join(index_dir, "corpus_id_map.json"), "w") as f:
+            json.dump(corpus_id_map, f, indent=2)
+
+    return vectorstore
+
+
+if __name__ == "__main__":
+    all_docs, corpus_id_map = load_corpus_pages()
+    chunks = make_chunks(all_docs)
+    embedding_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    build_index(chunks, embedding_model, INDEX_DIR, corpus_id_map)
+    print(f"✅ Saved FAISS index to '{INDEX_DIR}' with {len(chunks)} chunks")
@@ -0,0 +1,172 @@
+# scripts/asset_variants.py
+#
+# Pre-generates resized WebP/AVIF/JPEG and thumbnail variants of the pose overlay
+# library in static/image_output and picks the best one for a request's Accept
+# header. Variant filenames embed the source content hash, so they can be served
+# with long-lived immutable caching and the hash doubles as the ETag.
+#
+#     python scripts/asset_variants.py          # build/refresh variants
+
+import os
+import json
+import hashlib
+import threading
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSET_SRC_DIR = os.path.join(PROJECT_ROOT, "static", "image_output")
+VARIANTS_DIR = os.path.join(ASSET_SRC_DIR, "variants")
+MANIFEST_PATH = os.path.join(VARIANTS_DIR, "manifest.json")
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Longest side in pixels; "thumb" covers the 300px chat bubble at 2x density.
+SIZES = {"full": 1280, "thumb": 600}
+# Preferred first; JPEG is the fallback every client accepts.
+FORMATS = [
+    ("image/avif", "avif", {"quality": 50}),
+    ("image/webp", "webp", {"quality": 78, "method": 6}),
+    ("image/jpeg", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+]
+FALLBACK_MIME = "image/jpeg"
+
+
+def _content_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _supported_formats():
+    from PIL import features
+    try:
+        import pillow_avif  # noqa: F401  (registers AVIF on Pillow < 11.3)
+    except ImportError:
+        pass
+    supported = []
+    for mime, ext, options in FORMATS:
+        if ext == "avif" and not features.check("avif"):
+            continue
+        if ext == "webp" and not features.check("webp"):
+            continue
+        supported.append((mime, ext, options))
+    return supported
+
+
+def build_variants(src_dir=ASSET_SRC_DIR, out_dir=VARIANTS_DIR, manifest_path=MANIFEST_PATH):
+    """Generate missing variants for every source image and rewrite the manifest; returns the manifest."""
+    from PIL import Image
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _read_manifest(manifest_path)
+    formats = _supported_formats()
+    fresh = {}
+
+    for name in sorted(os.listdir(src_dir)):
+        src_path = os.path.join(src_dir, name)
+        if not os.path.isfile(src_path) or not name.lower().endswith(SOURCE_EXTENSIONS):
+            continue
+        digest = _content_hash(src_path)
+        existing = manifest.get(name)
+        if existing and existing["hash"] == digest and all(
+            os.path.isfile(os.path.join(out_dir, f)) for size in existing["variants"].values() for f in size.values()
+        ):
+            fresh[name] = existing
+            continue
+
+        stem = os.path.splitext(name)[0]
+        entry = {"hash": digest, "original_bytes": os.path.getsize(src_path), "variants": {}}
+        with Image.open(src_path) as img:
+            img = img.convert("RGB")
+            for size_name, max_side in SIZES.items():
+                resized = img.copy()
+                resized.thumbnail((max_side, max_side), Image.LANCZOS)
+                entry["variants"][size_name] = {}
+                for mime, ext, options in formats:
+                    filename = f"{stem}.{digest}.{size_name}.{ext}"
+                    resized.save(os.path.join(out_dir, filename), **options)
+                    entry["variants"][size_name][mime] = filename
+        fresh[name] = entry
+
+        full_bytes = min(os.path.getsize(os.path.join(out_dir, f)) for f in entry["variants"]["full"].values())
+        print(f"🖼️  {name}: {entry['original_bytes']} -> {full_bytes} bytes (smallest full variant)")
+
+    # Drop variants whose source was removed or changed.
+    keep = {f for entry in fresh.values() for size in entry["variants"].values() for f in size.values()}
+    for filename in os.listdir(out_dir):
+        if filename != os.path.basename(manifest_path) and filename not in keep:
+            os.remove(os.path.join(out_dir, filename))
+
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(fresh, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return fresh
+
+
+def _read_manifest(manifest_path=MANIFEST_PATH):
+    if not os.path.isfile(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _accepted_mimes(accept_header):
+    """MIME types the client lists explicitly with q > 0 (wildcards are not trusted for new formats)."""
+    accepted = set()
+    for part in (accept_header or "").split(","):
+        fields = [p.strip() for p in part.split(";")]
+        mime = fields[0].lower()
+        quality = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if mime and quality > 0:
+            accepted.add(mime)
+    return accepted
+
+
+class AssetVariants:
+    """Manifest lookup and content negotiation for the pre-generated variants."""
+
+    def __init__(self, variants_dir=VARIANTS_DIR, manifest_path=MANIFEST_PATH):
+        self.variants_dir = variants_dir
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self.manifest = _read_manifest(manifest_path)
+
+    def rebuild(self):
+        with self._lock:
+            self.manifest = build_variants(out_dir=self.variants_dir, manifest_path=self.manifest_path)
+
+    def url_for(self, image_path, size="full"):
+        """Versioned /media URL for a static image path, or None if it has no variants."""
+        name = os.path.basename(image_path)
+        entry = self.manifest.get(name)
+        if entry is None or size not in entry["variants"]:
+            return None
+        return f"/media/{name}?size={size}&v={entry['hash']}"
+
+    def negotiate(self, name, accept_header, size="full"):
+        """Return (absolute_path, mime, etag, version) of the best variant, or None if unknown."""
+        entry = self.manifest.get(name)
+        if entry is None:
+            return None
+        if size not in entry["variants"]:
+            size = "full"
+        variants = entry["variants"][size]
+        accepted = _accepted_mimes(accept_header)
+        mime = next((m for m, _, _ in FORMATS if m in variants and m in accepted), FALLBACK_MIME)
+        if mime not in variants:
+            mime = next(iter(variants))
+        filename = variants[mime]
+        etag = f"{entry['hash']}-{size}-{mime.split('/')[1]}"
+        return os.path.join(self.variants_dir, filename), mime, etag, entry["hash"]
+
+
+if __name__ == "__main__":
+    manifest = build_variants()
+    print(f"✅ {len(manifest)} images with variants in '{VARIANTS_DIR}'")
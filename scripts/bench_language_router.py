@@ -0,0 +1,104 @@
+# scripts/bench_language_router.py
+#
+# Accuracy and latency of scripts/language_router.py against plain langdetect on a
+# hand-labelled query set. Run from the project root:
+#
+#     python scripts/bench_language_router.py [--labels labels.jsonl]
+#
+# The default labels in data/language_gold.jsonl cover every distinct query in
+# chat_logs.jsonl plus Persian without pe/che/zhe/gaf and Latin-script queries in
+# languages other than English. --labels points at another file of
+# {"query": ..., "lang": ...} lines. Accuracy is reported both on the exact
+# language and on the routing bucket run_rag_pipeline acts on (ar/fa/other).
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts import language_router
+from scripts.chat_logs import load_logged_queries
+
+ROUTED_LANGS = ("ar", "fa")
+GOLD_LABELS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'language_gold.jsonl')
+
+
+def routing_bucket(lang):
+    """What run_rag_pipeline does with a detected language: translate from ar/fa, or use as-is."""
+    return lang if lang in ROUTED_LANGS else "en"
+
+
+def load_labels(path=GOLD_LABELS_PATH):
+    queries, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                queries.append(entry["query"])
+                labels.append(entry["lang"])
+    return queries, labels
+
+
+def timed(fn, queries):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def summarize(name, results, latencies, labels):
+    exact = sum(r == l for r, l in zip(results, labels))
+    routed = sum(routing_bucket(r) == routing_bucket(l) for r, l in zip(results, labels))
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{name:<22} exact {100.0 * exact / len(labels):5.1f}%, routing {100.0 * routed / len(labels):5.1f}%, "
+          f"p50 {statistics.median(latencies) * 1e6:9.1f} us, p95 {p95 * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark language routing.")
+    parser.add_argument("--labels", help="JSONL file of {\"query\": ..., \"lang\": ...} gold labels (default: data/language_gold.jsonl).")
+    parser.add_argument("--repeats", type=int, default=5, help="Unseeded langdetect runs used to measure instability.")
+    args = parser.parse_args()
+
+    queries, labels = load_labels(args.labels or GOLD_LABELS_PATH)
+    print(f"Queries: {len(queries)} labelled ({sum(l != 'en' for l in labels)} non-English)")
+    unlabelled = set(load_logged_queries()) - set(queries)
+    if unlabelled:
+        print(f"[WARN] {len(unlabelled)} chat_logs.jsonl queries have no gold label")
+
+    results, latencies = timed(language_router.route_query, queries)
+    summarize("language_router", [detected for detected, _ in results], latencies, labels)
+
+    try:
+        from langdetect import detect, DetectorFactory
+    except ImportError:
+        print("langdetect is not installed; skipping the comparison.")
+        sys.exit(0)
+
+    def langdetect_or_unknown(q):
+        try:
+            return detect(q)
+        except Exception:
+            return "unknown"
+
+    # The first call pays langdetect's profile loading; report it separately.
+    start = time.perf_counter()
+    langdetect_or_unknown("warm up")
+    print(f"langdetect first call  {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    # language_router seeds the shared factory on first use; undo that for these runs.
+    DetectorFactory.seed = None
+    runs = [timed(langdetect_or_unknown, queries) for _ in range(args.repeats)]
+    summarize("langdetect (unseeded)", runs[0][0], runs[0][1], labels)
+    unstable = sum(len({run[0][i] for run in runs}) > 1 for i in range(len(queries)))
+    print(f"langdetect (unseeded)  changed its answer on {unstable}/{len(queries)} queries across {args.repeats} runs")
+
+    DetectorFactory.seed = 0
+    results, latencies = timed(langdetect_or_unknown, queries)
+    summarize("langdetect (seeded)", results, latencies, labels)
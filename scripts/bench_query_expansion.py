@@ -0,0 +1,207 @@
+# scripts/bench_query_expansion.py
+#
+# Compares the compiled QueryExpander with the old dict-literal expand_query.
+# Run from the project root:
+#
+#     python scripts/bench_query_expansion.py [--embed]
+#
+# --embed additionally times the per-request embedding of expansion terms that the
+# old pipeline paid on every query (needs the sentence-transformers model).
+
+import os
+import sys
+import time
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.query_expansion import QueryExpander
+from scripts.chat_logs import load_logged_queries
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def legacy_expand_query(query: str) -> List[str]:
+    """Verbatim copy of the pre-QueryExpander rag_core.expand_query, kept as the benchmark baseline."""
+    expansions = {
+        # Football
+        "football rules": [
+            "soccer rules",
+            "FIFA rules",
+            "laws of the game",
+            "association football regulations"
+        ],
+        "football positions": [
+            "soccer positions",
+            "striker",
+            "midfielder",
+            "defender",
+            "goalkeeper"
+        ],
+        "football training": [
+            "soccer drills",
+            "soccer practice",
+            "ball control exercises",
+            "passing drills",
+            "shooting drills"
+        ],
+        # Basketball
+        "basketball rules": [
+            "FIBA rules",
+            "basketball regulations",
+            "official basketball rules"
+        ],
+        "basketball positions": [
+            "point guard",
+            "shooting guard",
+            "small forward",
+            "power forward",
+            "center"
+        ],
+        "basketball training": [
+            "basketball drills",
+            "shooting practice",
+            "dribbling drills",
+            "defensive drills"
+        ],
+        # Tennis
+        "tennis rules": [
+            "ITF rules",
+            "tennis regulations",
+            "tennis scoring system"
+        ],
+        "tennis training": [
+            "tennis drills",
+            "serve practice",
+            "forehand drills",
+            "backhand drills"
+        ],
+        # Padel
+        "padel rules": [
+            "padel regulations",
+            "official padel rules",
+            "world padel tour rules"
+        ],
+        "padel training": [
+            "padel drills",
+            "padel forehand",
+            "padel backhand",
+            "padel serve practice"
+        ],
+        # Swimming
+        "swimming styles": [
+            "swimming strokes",
+            "butterfly stroke",
+            "backstroke",
+            "breaststroke",
+            "freestyle"
+        ],
+        "swimming training": [
+            "swimming drills",
+            "swimming endurance",
+            "kickboard exercises"
+        ],
+        # Cardio
+        "cardio exercise": [
+            "aerobic exercise",
+            "endurance training",
+            "running",
+            "cycling",
+            "jump rope"
+        ],
+        # Yoga
+        "yoga": [
+            "asanas",
+            "yoga poses",
+            "yoga practice",
+            "yoga breathing",
+            "yoga styles"
+        ],
+        # Warm-up
+        "warm up": [
+            "pre-exercise warmup",
+            "dynamic stretching",
+            "mobility exercises"
+        ],
+        # Cooldown
+        "cooldown": [
+            "post-exercise cooldown",
+            "static stretching",
+            "relaxation exercises"
+        ],
+        # HIIT
+        "hiit": [
+            "high intensity interval training",
+            "interval workouts",
+            "tabata training"
+        ],
+        # Stretching
+        "stretching": [
+            "flexibility exercises",
+            "mobility drills",
+            "static stretches",
+            "dynamic stretches"
+        ],
+    }
+
+    if "football" in query.lower():
+        query = query.replace("football", "soccer (association football)")
+
+    for key, extra_terms in expansions.items():
+        if key in query.lower():
+            return [query] + extra_terms
+
+    return [query]
+
+
+def time_per_call(fn, queries, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - start) / (rounds * len(queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark query expansion.")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--embed", action="store_true", help="Also time embedding of the expansion terms.")
+    args = parser.parse_args()
+
+    queries = load_logged_queries()
+    expander = QueryExpander()
+
+    legacy_s = time_per_call(legacy_expand_query, queries, args.rounds)
+    compiled_s = time_per_call(expander.expand, queries, args.rounds)
+    legacy_terms = sum(len(legacy_expand_query(q)) - 1 for q in queries)
+    compiled_terms = sum(len(expander.expand(q)) - 1 for q in queries)
+    legacy_hits = sum(len(legacy_expand_query(q)) > 1 for q in queries)
+    compiled_hits = sum(len(expander.expand(q)) > 1 for q in queries)
+
+    print(f"Queries: {len(queries)} from chat_logs.jsonl, {args.rounds} rounds")
+    print(f"legacy expand_query   : {legacy_s * 1e6:8.2f} us/query, {legacy_hits} queries expanded, {legacy_terms} extra terms")
+    print(f"compiled QueryExpander: {compiled_s * 1e6:8.2f} us/query, {compiled_hits} queries expanded, {compiled_terms} extra terms")
+
+    if args.embed:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+        start = time.perf_counter()
+        for q in queries:
+            embedder.embed_documents(legacy_expand_query(q)[1:])
+        legacy_embed_s = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        expander.warm(embedder)
+        warm_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            terms = expander.expand(q)[1:]
+            missing = [t for t in terms if t not in expander.cached_vectors(terms)]
+            if missing:
+                embedder.embed_documents(missing)
+        compiled_embed_s = (time.perf_counter() - start) / len(queries)
+
+        print(f"legacy expansion embedding  : {legacy_embed_s * 1e3:8.2f} ms/query")
+        print(f"cached expansion embedding  : {compiled_embed_s * 1e3:8.2f} ms/query (one-off warm-up {warm_s:.2f} s)")
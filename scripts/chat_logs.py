@@ -0,0 +1,31 @@
+# scripts/chat_logs.py
+
+import os
+import json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CHAT_LOGS_PATH = os.path.join(PROJECT_ROOT, "chat_logs.jsonl")
+
+
+def load_logged_queries(path=CHAT_LOGS_PATH, limit=None, unique=False):
+    """
+    Return the user queries recorded in chat_logs.jsonl, in log order.
+
+    Malformed lines and entries without a query are skipped. With `unique`,
+    repeated queries are kept only once; `limit` caps how many are returned.
+    """
+    queries = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(queries) >= limit:
+                break
+            try:
+                query = json.loads(line).get("user_query", "")
+            except json.JSONDecodeError:
+                continue
+            if not query or (unique and query in seen):
+                continue
+            seen.add(query)
+            queries.append(query)
+    return queries
@@ -2,26 +2,40 @@
 
 from langchain.schema import Document
 from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
+import argparse
 import json
 import os
+import sys
 import numpy as np # Still good to have for general numeric operations if needed, though not directly used for embedding in this LangChain flow.
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.record_store import RecordStore
+
 # --- Configuration ---
 VALUE_JSON_PATH = os.path.join("data", "value_resources.json")
 CULTURAL_JSON_PATH = os.path.join("data", "cultural_resources.json") # Path for your cultural data
-FAISS_BASE_DIR = "vector2_db" # Base directory for FAISS databases
+FAISS_BASE_DIR = "vector_dbs" # Base directory for the auxiliary FAISS databases (discovered by scripts/index_registry.py)
 VALUE_FAISS_DIR = os.path.join(FAISS_BASE_DIR, "value_advice_db")
 CULTURAL_FAISS_DIR = os.path.join(FAISS_BASE_DIR, "cultural_info_db")
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
-# --- Load Embedding Model ---
-# The HuggingFaceEmbeddings class handles loading the tokenizer and model internally
-print(f"Initializing embedding model: {EMBEDDING_MODEL_NAME}")
-embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
-print("Embedding model initialized.")
+# --- Record ids shared by fresh builds and migrated indexes ---
+def make_record_id(doc_type, item, position):
+    if doc_type == "cultural":
+        return f"{doc_type}:{item.get('cultural_id') or position}"
+    return f"{doc_type}:{position}"
+
+
+def unique_record_id(record_id, records, position):
+    """Suffix a colliding id (e.g. a repeated cultural_id) with the item's position so no record is overwritten."""
+    if record_id in records:
+        print(f"⚠️ Warning: Duplicate record id '{record_id}'; storing item {position} as '{record_id}#{position}'.")
+        record_id = f"{record_id}#{position}"
+    return record_id
 
 # --- Helper function to load JSON and create LangChain Documents ---
+# Documents carry only a compact `record_id` in their metadata; the full items are
+# returned alongside them and written to a RecordStore next to the index.
 def load_and_prepare_documents(json_path, doc_type="value"):
     try:
         with open(json_path, "r", encoding="utf-8") as f:
@@ -29,15 +43,15 @@ def load_and_prepare_documents(json_path, doc_type="value"):
         print(f"✅ Successfully loaded {len(articles)} {doc_type} documents from '{json_path}'.")
     except FileNotFoundError:
         print(f"❌ Error: JSON file not found at '{json_path}'. Please check the path.")
-        return []
+        return [], {}
     except json.JSONDecodeError:
         print(f"❌ Error: Could not decode JSON from '{json_path}'. Check file format.")
-        return []
+        return [], {}
 
     documents_for_faiss = []
-    for item in articles:
-        text_for_embedding = ""
-        metadata = {}
+    records = {}
+    for position, item in enumerate(articles):
+        text_parts = []
 
         if doc_type == "value":
             # --- Logic for Value Resources (as per your previous project) ---
@@ -46,72 +60,140 @@ def load_and_prepare_documents(json_path, doc_type="value"):
                 continue
 
             synthesized_data = item["synthesized_output"]
-            pdf_filename = item.get("pdf_filename", "unknown_filename.pdf")
 
-            text_for_embedding = synthesized_data.get("paper_name", "")
+            text_parts.append(synthesized_data.get("paper_name", ""))
             if synthesized_data.get("keywords"):
-                text_for_embedding += " " + ", ".join(synthesized_data["keywords"])
+                text_parts.append(", ".join(synthesized_data["keywords"]))
 
             if "extracted_sociocultural_elements_from_paper" in synthesized_data:
                 for meta_type, elements in synthesized_data["extracted_sociocultural_elements_from_paper"].items():
                     if isinstance(elements, dict):
                         for key, val in elements.items():
-                            if val.get("concept"):
-                                text_for_embedding += " " + val["concept"]
-                            if val.get("description"):
-                                text_for_embedding += " " + val["description"]
+                            text_parts.append(val.get("concept") or "")
+                            text_parts.append(val.get("description") or "")
                     elif isinstance(elements, list):
                         for elem in elements:
-                            if elem.get("name"):
-                                text_for_embedding += " " + elem["name"]
-                            if elem.get("description"):
-                                text_for_embedding += " " + elem["description"]
+                            text_parts.append(elem.get("name") or "")
+                            text_parts.append(elem.get("description") or "")
 
             if synthesized_data.get("conclusion_of_how_collected_information_from_resource_would_inform_generating_a_response_for_user_if_any"):
                 for guidance_entry in synthesized_data["conclusion_of_how_collected_information_from_resource_would_inform_generating_a_response_for_user_if_any"]:
-                    if guidance_entry.get("llm_response_guidance"):
-                        text_for_embedding += " " + guidance_entry["llm_response_guidance"]
+                    text_parts.append(guidance_entry.get("llm_response_guidance") or "")
 
-            metadata = {
-                "pdf_filename": pdf_filename,
-                "full_data": item # Store the ENTIRE original item
-            }
+            record_id = make_record_id(doc_type, item, position)
 
         elif doc_type == "cultural":
             # --- Logic for Cultural Resources (based on your bare-bones structure) ---
-            text_for_embedding = (
+            text_parts.append(
                 f"Cultural Element: {item.get('cultural_element_name', '')}. "
                 f"Region: {item.get('region', '')}. "
                 f"Description: {item.get('description', '')}. "
                 f"Examples: {', '.join(item.get('examples', []))}"
             )
-            metadata = {
-                "cultural_id": item.get('cultural_id'),
-                "cultural_element_name": item.get('cultural_element_name'),
-                "full_data": item # Store the ENTIRE original item
-            }
-        
+            record_id = make_record_id(doc_type, item, position)
+
+        else:
+            continue
+
+        text_for_embedding = " ".join(part for part in text_parts if part)
+
         # Only add if we have content for embedding
         if text_for_embedding.strip():
+            record_id = unique_record_id(record_id, records, position)
+            records[record_id] = item
             documents_for_faiss.append(Document(
                 page_content=text_for_embedding.strip(),
-                metadata=metadata
+                metadata={"record_id": record_id}
             ))
 
     print(f"Prepared {len(documents_for_faiss)} {doc_type} documents for FAISS indexing.")
-    return documents_for_faiss
+    return documents_for_faiss, records
+
+
+def build_index(documents, records, embedder, index_dir):
+    db = FAISS.from_documents(documents, embedder)
+    db.save_local(index_dir)
+    RecordStore.for_index(index_dir).write(records)
+    return db
+
+
+# --- Migration for indexes built before the record store existed ---
+def migrate_index(index_dir):
+    """
+    Move `full_data` out of an existing index.pkl into a RecordStore, without re-embedding.
+
+    Record ids follow make_record_id, with the position taken from the item's place
+    in the source JSON, so a migrated store matches a fresh build of the same data.
+    """
+    db = FAISS.load_local(index_dir, None, allow_dangerous_deserialization=True)
+    sources = {}
+    used_positions = {}
+    records = {}
+    for faiss_position, docstore_id in sorted(db.index_to_docstore_id.items()):
+        doc = db.docstore.search(docstore_id)
+        full_data = doc.metadata.get("full_data")
+        if full_data is None:
+            continue
+        doc_type = "cultural" if "cultural_id" in doc.metadata else "value"
+        if doc_type not in sources:
+            json_path = CULTURAL_JSON_PATH if doc_type == "cultural" else VALUE_JSON_PATH
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    sources[doc_type] = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                sources[doc_type] = []
+        # Identical items take successive source positions, in index order like a fresh build.
+        used = used_positions.setdefault(doc_type, set())
+        matches = [i for i, item in enumerate(sources[doc_type]) if item == full_data and i not in used]
+        position = matches[0] if matches else faiss_position
+        used.add(position)
+        record_id = unique_record_id(make_record_id(doc_type, full_data, position), records, position)
+        records[record_id] = full_data
+        doc.metadata = {"record_id": record_id}
+
+    if not records:
+        print(f"Nothing to migrate in '{index_dir}'.")
+        return 0
+
+    pkl_path = os.path.join(index_dir, "index.pkl")
+    size_before = os.path.getsize(pkl_path)
+    RecordStore.for_index(index_dir).write(records)
+    db.save_local(index_dir)
+    print(f"✅ Migrated {len(records)} records in '{index_dir}': index.pkl {size_before} -> {os.path.getsize(pkl_path)} bytes.")
+    return len(records)
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the value/cultural FAISS databases.")
+    parser.add_argument("--migrate", nargs="*", metavar="INDEX_DIR",
+                        help="Move full_data out of existing indexes into records.sqlite instead of rebuilding "
+                             "(defaults to the value and cultural index directories).")
+    args = parser.parse_args()
+
+    if args.migrate is not None:
+        for index_dir in args.migrate or [VALUE_FAISS_DIR, CULTURAL_FAISS_DIR]:
+            try:
+                migrate_index(index_dir)
+            except Exception as e:
+                print(f"❌ Error migrating '{index_dir}': {e}")
+        sys.exit(0)
+
+    # --- Load Embedding Model ---
+    # Imported here so --migrate works without the embedding model installed.
+    # The HuggingFaceEmbeddings class handles loading the tokenizer and model internally
+    from langchain_huggingface import HuggingFaceEmbeddings
+    print(f"Initializing embedding model: {EMBEDDING_MODEL_NAME}")
+    embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    print("Embedding model initialized.")
+
     os.makedirs(FAISS_BASE_DIR, exist_ok=True)
 
     # --- Process Value Resources ---
-    value_docs = load_and_prepare_documents(VALUE_JSON_PATH, "value")
+    value_docs, value_records = load_and_prepare_documents(VALUE_JSON_PATH, "value")
     if value_docs:
         print(f"Creating FAISS DB for value resources in '{VALUE_FAISS_DIR}'...")
         try:
-            value_db = FAISS.from_documents(value_docs, embedder)
-            value_db.save_local(VALUE_FAISS_DIR)
+            build_index(value_docs, value_records, embedder, VALUE_FAISS_DIR)
             print(f"✅ Value advice DB created and saved to `{os.path.abspath(VALUE_FAISS_DIR)}`.")
         except Exception as e:
             print(f"❌ Error creating/saving value FAISS DB: {e}")
@@ -121,12 +203,11 @@ if __name__ == "__main__":
     print("-" * 50) # Separator for clarity
 
     # --- Process Cultural Resources ---
-    cultural_docs = load_and_prepare_documents(CULTURAL_JSON_PATH, "cultural")
+    cultural_docs, cultural_records = load_and_prepare_documents(CULTURAL_JSON_PATH, "cultural")
     if cultural_docs:
         print(f"Creating FAISS DB for cultural resources in '{CULTURAL_FAISS_DIR}'...")
         try:
-            cultural_db = FAISS.from_documents(cultural_docs, embedder)
-            cultural_db.save_local(CULTURAL_FAISS_DIR)
+            build_index(cultural_docs, cultural_records, embedder, CULTURAL_FAISS_DIR)
             print(f"✅ Cultural information DB created and saved to `{os.path.abspath(CULTURAL_FAISS_DIR)}`.")
         except Exception as e:
             print(f"❌ Error creating/saving cultural FAISS DB: {e}")
@@ -0,0 +1,175 @@
+# scripts/index_registry.py
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+from scripts.record_store import RecordStore
+
+# Optional per-index settings, e.g. {"weight": 0.5, "min_score": 0.5, "enabled": false}.
+INDEX_META_FILE = "index_meta.json"
+
+
+def _is_index_dir(path):
+    return os.path.isfile(os.path.join(path, "index.faiss")) and os.path.isfile(os.path.join(path, "index.pkl"))
+
+
+class _IndexEntry:
+    def __init__(self, name, path, weight=1.0, min_score=0.0):
+        self.name = name
+        self.path = path
+        self.weight = weight
+        self.min_score = min_score
+        self.store = None
+        self.records = RecordStore.for_index(path)
+        self.lock = threading.Lock()
+
+
+class IndexRegistry:
+    """
+    Discovers every FAISS index under the given roots and searches them together.
+
+    A root is itself an index if it holds index.faiss/index.pkl, and each immediate
+    subdirectory that holds them is an index too. Indexes are loaded on first use,
+    so adding a knowledge base only means dropping its directory into a root.
+    """
+
+    def __init__(self, roots, embedder, max_workers=4):
+        self.roots = roots
+        self.embedder = embedder
+        self.max_workers = max_workers
+        self.indexes = {}
+        self.discover()
+
+    def discover(self):
+        found = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            candidates = [root] + [os.path.join(root, d) for d in sorted(os.listdir(root))]
+            for path in candidates:
+                if not os.path.isdir(path) or not _is_index_dir(path):
+                    continue
+                name = os.path.basename(os.path.normpath(path))
+                if name in found:
+                    print(f"[WARN] Skipping duplicate index name '{name}' at {path}")
+                    continue
+                meta = self._read_meta(path)
+                if not meta.get("enabled", True):
+                    continue
+                weight = float(meta.get("weight", 1.0))
+                min_score = float(meta.get("min_score", 0.0))
+                existing = self.indexes.get(name)
+                if existing is not None and existing.path == path:
+                    existing.weight = weight
+                    existing.min_score = min_score
+                    found[name] = existing
+                else:
+                    found[name] = _IndexEntry(name, path, weight, min_score)
+
+        self.indexes = found
+        print(f"[DEBUG] Discovered indexes: {', '.join(found) or 'none'}")
+        return list(found)
+
+    def has_index_at(self, path):
+        target = os.path.normpath(os.path.abspath(path))
+        return any(os.path.normpath(os.path.abspath(e.path)) == target for e in self.indexes.values())
+
+    def load_all(self):
+        for entry in self.indexes.values():
+            self._load(entry)
+
+    def search(self, queries, k=8, names=None, query_vectors=None, limit=None):
+        """
+        Search the indexes (all of them, or only `names`) for every query and return
+        one merged [(Document, score)] list of at most `limit` (default `k`) entries,
+        however many queries were given.
+
+        `query_vectors` maps query text to a precomputed embedding; any other query
+        is embedded once here and reused across indexes.
+
+        Scoring: every index is built with the same embedding model and L2 metric, so
+        1 / (1 + distance) is directly comparable across indexes and is deliberately not
+        min-max/z-score normalized per index (that would lift the best hit of an
+        unrelated index to the top). Relevance is instead controlled per index through
+        index_meta.json: hits below `min_score` are dropped, so an off-topic index
+        contributes nothing, and the rest are scaled by `weight`. Duplicate chunks keep
+        their best score.
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+        entries = [e for e in self.indexes.values() if names is None or e.name in names]
+        if not queries or not entries:
+            return []
+
+        known = query_vectors or {}
+        missing = [q for q in queries if q not in known]
+        embedded = dict(zip(missing, self.embedder.embed_documents(missing))) if missing else {}
+        vectors = [known[q] if q in known else embedded[q] for q in queries]
+        jobs = [(entry, vector) for entry in entries for vector in vectors]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            batches = list(pool.map(lambda job: self._search_one(job[0], job[1], k), jobs))
+
+        best = {}
+        for batch in batches:
+            for doc, score in batch:
+                current = best.get(doc.page_content)
+                if current is None or score > current[1]:
+                    best[doc.page_content] = (doc, score)
+
+        ranked = sorted(best.values(), key=lambda pair: pair[1], reverse=True)[:limit or k]
+        self._hydrate([doc for doc, _ in ranked])
+        return ranked
+
+    def _hydrate(self, docs):
+        """Attach `full_data` from each index's RecordStore to the returned docs only."""
+        wanted = {}
+        for doc in docs:
+            if "record_id" in doc.metadata and "full_data" not in doc.metadata:
+                wanted.setdefault(doc.metadata["index"], []).append(doc)
+
+        for name, index_docs in wanted.items():
+            records = self.indexes[name].records
+            if not records.exists():
+                continue
+            found = records.get_many(doc.metadata["record_id"] for doc in index_docs)
+            for doc in index_docs:
+                item = found.get(str(doc.metadata["record_id"]))
+                if item is not None:
+                    doc.metadata["full_data"] = item
+
+    def _search_one(self, entry, vector, k):
+        store = self._load(entry)
+        results = []
+        for doc, distance in store.similarity_search_with_score_by_vector(vector, k=k):
+            similarity = 1.0 / (1.0 + float(distance))
+            if similarity < entry.min_score:
+                continue
+            metadata = dict(doc.metadata)
+            metadata["index"] = entry.name
+            score = entry.weight * similarity
+            results.append((Document(page_content=doc.page_content, metadata=metadata), score))
+        return results
+
+    def _load(self, entry):
+        if entry.store is None:
+            with entry.lock:
+                if entry.store is None:
+                    print(f"[DEBUG] Loading index '{entry.name}' from {entry.path}")
+                    entry.store = FAISS.load_local(entry.path, self.embedder, allow_dangerous_deserialization=True)
+        return entry.store
+
+    @staticmethod
+    def _read_meta(path):
+        meta_path = os.path.join(path, INDEX_META_FILE)
+        if not os.path.isfile(meta_path):
+            return {}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[WARN] Ignoring unreadable {meta_path}: {e}")
+            return {}
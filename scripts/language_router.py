@@ -0,0 +1,136 @@
+# scripts/language_router.py
+
+import re
+
+# Arabic-script blocks: Arabic, Arabic Supplement, Arabic Extended-A, Presentation Forms A/B.
+ARABIC_SCRIPT_RE = re.compile("[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+LATIN_RE = re.compile("[A-Za-z\u00C0-\u024F]")
+LETTER_RE = re.compile(r"[^\W\d_]")
+
+# Letters that only Persian uses (pe, che, zhe, gaf) count double; keheh, Farsi yeh and
+# Persian digits also show up in Arabic typed on Persian keyboards, so they count once.
+PERSIAN_STRONG = set("پچژگ")
+PERSIAN_WEAK = set("کی۰۱۲۳۴۵۶۷۸۹")
+# Teh marbuta, alef maksura, Arabic yeh and Arabic kaf are not used in Persian spelling.
+ARABIC_ONLY = set("ةىيك")
+
+# Words that are common in English queries and are not ordinary words in the other
+# Latin-script languages users write in. Short words like "a", "in", "do" or "was"
+# are left out on purpose: they are just as common in German, Italian or Spanish.
+ENGLISH_MARKERS = {
+    "the", "what", "how", "which", "why", "when", "where", "who", "should", "does",
+    "are", "can", "your", "with", "and", "about", "some", "give", "show", "tell",
+    "best", "this", "that", "explain", "improve",
+}
+# Distinct marker words needed before skipping the statistical detector.
+ENGLISH_MIN_MARKERS = 2
+
+ANSWER_LANGUAGE_KEYWORDS = {
+    # Checked in this priority order when a query names more than one language.
+    "ar": ["answer in arabic", "in arabic", "arabic", "ans in arabic", "باللغة العربيه", "اجب بالعربيه"],
+    "en": ["answer in english", "ans in english", "in english", "english", "باللغة الانجليزيه", "اجب بالانجليزيه"],
+    "fa": ["answer in persian", "answer in farsi", "in persian", "in farsi", "بالفارسية", "اجب بالفارسية"],
+}
+
+
+def _normalize_override_text(text):
+    text = text.lower().strip()
+    return text.replace("إ", "ا").replace("أ", "ا").replace("آ", "ا").replace("ة", "ه").replace("ى", "ي")
+
+
+def _compile_overrides():
+    groups = []
+    for lang, keywords in ANSWER_LANGUAGE_KEYWORDS.items():
+        normalized = sorted({_normalize_override_text(k) for k in keywords}, key=len, reverse=True)
+        groups.append(f"(?P<{lang}>" + "|".join(re.escape(k) for k in normalized) + ")")
+    return re.compile("|".join(groups))
+
+
+OVERRIDE_RE = _compile_overrides()
+
+_detect = None
+
+
+def _statistical_detect(text):
+    """Seeded langdetect, imported on first use so script-decidable queries never load it."""
+    global _detect
+    if _detect is None:
+        try:
+            from langdetect import DetectorFactory, detect
+        except ImportError:
+            # Remember the failure so ambiguous queries do not retry the import every call.
+            print("[WARN] langdetect is not installed; ambiguous Latin-script queries will be 'unknown'")
+            _detect = lambda text: "unknown"
+            return "unknown"
+        DetectorFactory.seed = 0
+        _detect = detect
+    try:
+        return _detect(text)
+    except Exception:
+        return "unknown"
+
+
+def detect_answer_language_override(text):
+    """Return the language explicitly requested in the query ("ar", "en", "fa") or None."""
+    found = {match.lastgroup for match in OVERRIDE_RE.finditer(_normalize_override_text(text))}
+    for lang in ANSWER_LANGUAGE_KEYWORDS:
+        if lang in found:
+            return lang
+    return None
+
+
+def classify_script(text):
+    """Classify by Unicode script: "ar", "fa", "latin", "other" or "none" (no letters)."""
+    letters = LETTER_RE.findall(text)
+    if not letters:
+        return "none"
+
+    arabic = [c for c in letters if ARABIC_SCRIPT_RE.match(c)]
+    latin = sum(1 for c in letters if LATIN_RE.match(c))
+    if arabic and len(arabic) >= latin:
+        persian = sum(2 if c in PERSIAN_STRONG else 1 for c in arabic if c in PERSIAN_STRONG or c in PERSIAN_WEAK)
+        arabic_only = sum(1 for c in arabic if c in ARABIC_ONLY)
+        return "fa" if persian > arabic_only else "ar"
+    if latin * 2 >= len(letters):
+        return "latin"
+    return "other"
+
+
+def _english_marker_count(text):
+    """Distinct English marker words in text; 0 if it has accented Latin letters."""
+    if any(not c.isascii() for c in LATIN_RE.findall(text)):
+        return 0
+    return len(set(re.findall(r"[a-z']+", text.lower())) & ENGLISH_MARKERS)
+
+
+def detect_language(text):
+    """Script-first language detection; the statistical detector only sees ambiguous text."""
+    script = classify_script(text)
+    if script in ("ar", "fa"):
+        return script
+    if script == "none":
+        return "unknown"
+    if script == "latin":
+        markers = _english_marker_count(text)
+        if markers >= ENGLISH_MIN_MARKERS:
+            return "en"
+        detected = _statistical_detect(text)
+        # A single marker word only breaks the tie when langdetect has no answer.
+        if detected == "unknown" and markers:
+            return "en"
+        return detected
+    return _statistical_detect(text)
+
+
+def route_query(text):
+    """Return (detected_lang, answer_lang) for a query."""
+    detected_lang = detect_language(text)
+    desired_lang = detect_answer_language_override(text)
+
+    if desired_lang:
+        answer_lang = desired_lang
+    elif detected_lang in ("ar", "fa"):
+        answer_lang = detected_lang
+    else:
+        answer_lang = "en"
+    return detected_lang, answer_lang
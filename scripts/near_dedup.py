@@ -0,0 +1,107 @@
+# scripts/near_dedup.py
+
+import re
+import zlib
+import numpy as np
+from langchain.docstore.document import Document
+
+MERSENNE_PRIME = (1 << 31) - 1  # keeps a * x + b inside uint64 for 31-bit hashes
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+SHINGLE_SIZE = 5  # word n-grams
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _shingles(text, size=SHINGLE_SIZE):
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        shingles = _shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & MERSENNE_PRIME for s in shingles), dtype=np.uint64)
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _source_entry(metadata):
+    return {key: metadata.get(key) for key in ("corpus_id", "title", "year", "page") if key in metadata}
+
+
+def collapse_near_duplicates(docs, threshold=0.8, bands=BANDS):
+    """
+    Collapse chunks whose estimated Jaccard similarity (word 5-gram MinHash) is at
+    least `threshold` into one canonical Document.
+
+    Candidate pairs come from LSH banding and are confirmed against the full
+    signature before they are merged. The longest chunk in each cluster is kept;
+    its metadata gains `sources` (every contributing source, deduplicated) and
+    `duplicate_count`. Returns (deduplicated_docs, stats).
+    """
+    hasher = MinHasher()
+    rows = hasher.num_perm // bands
+    signatures = np.stack([hasher.signature(d.page_content) for d in docs]) if docs else np.empty((0, hasher.num_perm))
+    parent = list(range(len(docs)))
+
+    for band in range(bands):
+        buckets = {}
+        band_slice = signatures[:, band * rows:(band + 1) * rows]
+        for i, key in enumerate(map(bytes, band_slice)):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    root_i, root_j = _find(parent, i), _find(parent, j)
+                    if root_i != root_j and np.mean(signatures[i] == signatures[j]) >= threshold:
+                        parent[root_j] = root_i
+
+    clusters = {}
+    for i in range(len(docs)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+
+    deduped = []
+    for members in clusters.values():
+        canonical = max(members, key=lambda i: len(docs[i].page_content))
+        sources = []
+        for i in members:
+            entry = _source_entry(docs[i].metadata)
+            if entry not in sources:
+                sources.append(entry)
+        metadata = dict(docs[canonical].metadata)
+        metadata["sources"] = sources
+        metadata["duplicate_count"] = len(members)
+        deduped.append(Document(page_content=docs[canonical].page_content, metadata=metadata))
+
+    stats = {
+        "chunks_in": len(docs),
+        "chunks_out": len(deduped),
+        "chars_in": sum(len(d.page_content) for d in docs),
+        "chars_out": sum(len(d.page_content) for d in deduped),
+    }
+    return deduped, stats
+
+
+def format_stats(stats):
+    removed = stats["chunks_in"] - stats["chunks_out"]
+    pct = 100.0 * removed / stats["chunks_in"] if stats["chunks_in"] else 0.0
+    chars_pct = 100.0 * (stats["chars_in"] - stats["chars_out"]) / stats["chars_in"] if stats["chars_in"] else 0.0
+    return (f"{stats['chunks_in']} -> {stats['chunks_out']} chunks ({removed} near-duplicates, -{pct:.1f}%), "
+            f"{stats['chars_in']} -> {stats['chars_out']} chars (-{chars_pct:.1f}%)")
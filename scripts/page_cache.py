@@ -0,0 +1,54 @@
+# scripts/page_cache.py
+
+import os
+import json
+import hashlib
+from langchain.docstore.document import Document
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PAGE_CACHE_DIR = os.path.join(PROJECT_ROOT, "page_cache")
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_pdf_pages(path, cache_dir=PAGE_CACHE_DIR):
+    """
+    Return the pages of a PDF as Documents, parsing it with PyPDFLoader only once.
+
+    Extracted text is cached as JSONL (one {"page", "text"} line per page) under
+    `cache_dir`, keyed by the SHA-256 of the PDF bytes, so renaming a file keeps
+    its cache and editing it invalidates it. Returns (pages, cache_hit).
+    """
+    file_hash = file_sha256(path)
+    cache_path = os.path.join(cache_dir, f"{file_hash}.jsonl")
+
+    if os.path.isfile(cache_path):
+        pages = []
+        with open(cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                pages.append(Document(page_content=entry["text"], metadata={"page": entry["page"], "file_hash": file_hash}))
+        return pages, True
+
+    from langchain_community.document_loaders import PyPDFLoader
+    loaded = PyPDFLoader(path).load()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for number, page in enumerate(loaded):
+            page_number = page.metadata.get("page", number)
+            f.write(json.dumps({"page": page_number, "text": page.page_content}, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, cache_path)
+
+    pages = [
+        Document(page_content=page.page_content, metadata={"page": page.metadata.get("page", number), "file_hash": file_hash})
+        for number, page in enumerate(loaded)
+    ]
+    return pages, False
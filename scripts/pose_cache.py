@@ -0,0 +1,80 @@
+# scripts/pose_cache.py
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class PoseResultCache:
+    """
+    Pose-check results keyed by the SHA-256 of the uploaded image bytes.
+
+    Overlays are written to `cache_dir` as <key>.jpg and the feedback text is kept
+    in memory, so an identical re-upload is answered without decoding or running
+    the pose model. The store is capped by total overlay bytes and by entry count;
+    the least recently used entries (and their files) are evicted first.
+    """
+
+    def __init__(self, cache_dir, url_prefix, max_bytes=200 * 1024 * 1024, max_entries=2048):
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> {"message", "filename", "size"}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Overlays from a previous run have no feedback text in memory; start clean.
+        for name in os.listdir(cache_dir):
+            if name.endswith((".jpg", ".tmp")):
+                os.remove(os.path.join(cache_dir, name))
+
+    def _result(self, entry):
+        result = {"message": entry["message"]}
+        if entry["filename"]:
+            result["image_path"] = f"{self.url_prefix}/{entry['filename']}"
+        return result
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return self._result(entry)
+
+    def put(self, key, message, overlay_bytes=None):
+        filename = None
+        size = 0
+        if overlay_bytes is not None:
+            filename = f"{key}.jpg"
+            size = len(overlay_bytes)
+            # Unique temp name: concurrent uploads of the same image must not share it.
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key[:12], suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(overlay_bytes)
+            os.replace(tmp_path, os.path.join(self.cache_dir, filename))
+
+        entry = {"message": message, "filename": filename, "size": size}
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous["size"]
+            self._entries[key] = entry
+            self._total_bytes += size
+            self._evict()
+            return self._result(entry)
+
+    def _evict(self):
+        # Never evict the entry that was just stored, even if it alone exceeds the cap.
+        while len(self._entries) > 1 and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry["size"]
+            if entry["filename"]:
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry["filename"]))
+                except FileNotFoundError:
+                    pass
+            print(f"[DEBUG] Evicted pose overlay {key[:12]} (cache now {self._total_bytes} bytes)")
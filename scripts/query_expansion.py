@@ -0,0 +1,140 @@
+# scripts/query_expansion.py
+
+import os
+import re
+import json
+import time
+import threading
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+EXPANSIONS_PATH = os.path.join(PROJECT_ROOT, "data", "query_expansions.json")
+RELOAD_CHECK_INTERVAL = 2.0  # seconds between mtime checks of the expansions file
+
+
+class QueryExpander:
+    """
+    Topic-based query expansion compiled from data/query_expansions.json.
+
+    The table is compiled once into a single regex, so one scan of the query finds
+    every matching topic. After `warm(embedder)` the embedding of every expansion
+    term is cached, and `cached_vectors` hands them to retrieval so expansion adds
+    no embedding work per request. The file is reloaded when its mtime changes
+    (checked at most every RELOAD_CHECK_INTERVAL seconds).
+    """
+
+    def __init__(self, path=EXPANSIONS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self._embedder = None
+        self._vectors = {}
+        # (matcher, expansions, replacements), swapped as one tuple so a reload
+        # never exposes a half-updated table to a concurrent request.
+        self._compiled = (None, {}, [])
+        self.reload()
+
+    @staticmethod
+    def _validate(table):
+        """Raise ValueError unless `table` has the {"expansions": {str: [str]}, "replacements": {str: str}} shape."""
+        if not isinstance(table, dict):
+            raise ValueError("expected a JSON object at the top level")
+        expansions = table.get("expansions", {})
+        replacements = table.get("replacements", {})
+        if not isinstance(expansions, dict) or not all(
+            isinstance(k, str) and k and isinstance(v, list) and all(isinstance(t, str) for t in v)
+            for k, v in expansions.items()
+        ):
+            raise ValueError("'expansions' must map non-empty phrases to lists of strings")
+        if not isinstance(replacements, dict) or not all(
+            isinstance(k, str) and k and isinstance(v, str) for k, v in replacements.items()
+        ):
+            raise ValueError("'replacements' must map non-empty strings to strings")
+
+    def reload(self):
+        """Load and compile the table; on any error the previous table stays in use and the error is raised."""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            # Mark this version as seen even if it turns out invalid, so a broken
+            # file is reported once rather than on every reload check.
+            self._mtime = mtime
+            with open(self.path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+            self._validate(table)
+
+            expansions = {key.lower(): terms for key, terms in table.get("expansions", {}).items()}
+            # Longest phrase first so "football rules" wins over a shorter overlapping key.
+            keys = sorted(expansions, key=len, reverse=True)
+            matcher = re.compile("|".join(re.escape(k) for k in keys)) if keys else None
+            replacements = [
+                (re.compile(re.escape(src), re.IGNORECASE), dst)
+                for src, dst in table.get("replacements", {}).items()
+            ]
+            self._compiled = (matcher, expansions, replacements)
+            print(f"[DEBUG] Loaded {len(expansions)} query expansion topics from {self.path}")
+
+            if self._embedder is not None:
+                self._embed_missing(self.all_terms())
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + RELOAD_CHECK_INTERVAL
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.reload()
+        except Exception as e:
+            print(f"[WARN] Keeping previous query expansions, reload of {self.path} failed: {e}")
+
+    def all_terms(self):
+        terms = []
+        for extra_terms in self._compiled[1].values():
+            terms.extend(t for t in extra_terms if t not in terms)
+        return terms
+
+    def warm(self, embedder):
+        """Embed every expansion term once; later reloads embed only new terms."""
+        with self._lock:
+            self._embedder = embedder
+            self._embed_missing(self.all_terms())
+        print(f"[DEBUG] Cached embeddings for {len(self._vectors)} expansion terms")
+
+    def _embed_missing(self, terms):
+        missing = [t for t in terms if t not in self._vectors]
+        if missing:
+            self._vectors.update(zip(missing, self._embedder.embed_documents(missing)))
+
+    @staticmethod
+    def _match(matcher, query):
+        topics = []
+        if matcher is not None:
+            for match in matcher.finditer(query.lower()):
+                if match.group(0) not in topics:
+                    topics.append(match.group(0))
+        return topics
+
+    def matched_topics(self, query):
+        self._reload_if_changed()
+        return self._match(self._compiled[0], query)
+
+    def expand(self, query):
+        """Return [rewritten query] + the terms of every matching topic, without duplicates."""
+        self._reload_if_changed()
+        matcher, expansions, replacements = self._compiled
+
+        # Topics are matched on the user's wording, before replacements such as
+        # football -> soccer rewrite the query text.
+        topics = self._match(matcher, query)
+
+        rewritten = query
+        for pattern, replacement in replacements:
+            rewritten = pattern.sub(replacement, rewritten)
+
+        expanded = [rewritten]
+        for topic in topics:
+            expanded.extend(t for t in expansions[topic] if t not in expanded)
+        return expanded
+
+    def cached_vectors(self, terms):
+        return {t: self._vectors[t] for t in terms if t in self._vectors}
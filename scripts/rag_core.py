@@ -2,12 +2,14 @@
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import requests
-from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 from scripts.conversation_manager import ConversationManager
-from langdetect import detect
+from scripts.index_registry import IndexRegistry
+from scripts.query_expansion import QueryExpander
+from scripts.language_router import route_query
 from typing import List
 from langchain.schema import Document
 
@@ -41,15 +43,17 @@ if not FANAR_API_KEY:
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 FAISS_DB_DIR = os.path.join(PROJECT_ROOT, "vector2_db")
+VECTOR_DBS_DIR = os.path.join(PROJECT_ROOT, "vector_dbs")  # value_advice_db, cultural_info_db, ...
+INDEX_ROOTS = [FAISS_DB_DIR, VECTOR_DBS_DIR]
+MAX_RETRIEVED_DOCS = 10  # snippets passed to Fanar, independent of how many expansion terms matched
+TRANSLATION_WORKERS = 4  # answer bullets translated concurrently
+LANGUAGE_NAMES = {"ar": "Arabic", "fa": "Persian"}
 
 _embedder = None
-_db = None
+_registry = None
+_expander = None
 _conversation = None
 
-_embedder = None
-_value_db = None
-_cultural_db = None
-
 def make_rtl(text):
     return "\u202B" + text + "\u202C"
 
@@ -76,6 +80,47 @@ def translate_text_fanar(text, source_lang, target_lang):
     return data.get("text") or data.get("translated_text") or data.get("translation") or ""
 
 
+def split_answer_bullets(text):
+    """Split an answer into segments, one per '- ' bullet; continuation lines stay with their bullet."""
+    segments = []
+    for line in text.split("\n"):
+        if line.strip().startswith("- ") or not segments:
+            segments.append(line)
+        else:
+            segments[-1] += "\n" + line
+    return [seg for seg in segments if seg.strip()]
+
+
+def translate_bullet(segment, target_lang):
+    """Translate one answer segment, keeping its bullet marker; falls back to the English text on failure."""
+    stripped = segment.strip()
+    is_bullet = stripped.startswith("- ")
+    body = stripped[2:] if is_bullet else stripped
+    try:
+        translated = translate_text_fanar(body, "en", target_lang).strip() or body
+    except Exception as e:
+        print(f"[WARN] Bullet translation to {target_lang} failed, keeping English: {e}")
+        translated = body
+
+    if not is_bullet:
+        return translated
+    return convert_bullets_to_arabic("- " + translated) if target_lang == "ar" else "- " + translated
+
+
+def translate_answer_incrementally(reply_en, target_lang):
+    """
+    Translate an answer bullet by bullet in parallel, yielding (index, total, segment)
+    as each one finishes (completion order, not answer order).
+    """
+    segments = split_answer_bullets(reply_en)
+    if not segments:
+        return
+    with ThreadPoolExecutor(max_workers=min(TRANSLATION_WORKERS, len(segments))) as pool:
+        futures = {pool.submit(translate_bullet, seg, target_lang): i for i, seg in enumerate(segments)}
+        for future in as_completed(futures):
+            yield futures[future], len(segments), future.result()
+
+
 def detect_football_type(query: str, lang: str) -> str:
     if "كرة القدم" in query and lang == "ar":
         return "soccer"
@@ -115,167 +160,49 @@ def _load_embedder():
     if _embedder is None:
         _embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
 
-def _load_vector_db():
-    global _db
+def _load_vector_db(preload=False):
+    global _registry
     _load_embedder()
-    if _db is None:
-        _db = FAISS.load_local(FAISS_DB_DIR, _embedder, allow_dangerous_deserialization=True)
+    if _registry is None:
+        registry = IndexRegistry(INDEX_ROOTS, _embedder)
+        # The auxiliary indexes cannot answer sports questions on their own.
+        if not registry.has_index_at(FAISS_DB_DIR):
+            raise FileNotFoundError(
+                f"Primary FAISS index not found in {FAISS_DB_DIR} (expected index.faiss/index.pkl); run load_pdf.py first."
+            )
+        _load_query_expander().warm(_embedder)
+        _registry = registry
+    if preload:
+        _registry.load_all()
 
 def safe_generate_answer(fanar_response: str) -> str:
     if "not explicitly stated" in fanar_response.lower():
         return f"⚠️ Note: Some parts were not explicitly found in the database. Here is what was retrieved:\n\n{fanar_response}"
     return fanar_response
 
-def expand_query(query: str) -> List[str]:
-    """Expand the query with soccer, basketball, tennis, padel, swimming, cardio, yoga, warm-up, cooldown, HIIT, and stretching synonyms."""
-    expansions = {
-        # Football
-        "football rules": [
-            "soccer rules",
-            "FIFA rules",
-            "laws of the game",
-            "association football regulations"
-        ],
-        "football positions": [
-            "soccer positions",
-            "striker",
-            "midfielder",
-            "defender",
-            "goalkeeper"
-        ],
-        "football training": [
-            "soccer drills",
-            "soccer practice",
-            "ball control exercises",
-            "passing drills",
-            "shooting drills"
-        ],
-        # Basketball
-        "basketball rules": [
-            "FIBA rules",
-            "basketball regulations",
-            "official basketball rules"
-        ],
-        "basketball positions": [
-            "point guard",
-            "shooting guard",
-            "small forward",
-            "power forward",
-            "center"
-        ],
-        "basketball training": [
-            "basketball drills",
-            "shooting practice",
-            "dribbling drills",
-            "defensive drills"
-        ],
-        # Tennis
-        "tennis rules": [
-            "ITF rules",
-            "tennis regulations",
-            "tennis scoring system"
-        ],
-        "tennis training": [
-            "tennis drills",
-            "serve practice",
-            "forehand drills",
-            "backhand drills"
-        ],
-        # Padel
-        "padel rules": [
-            "padel regulations",
-            "official padel rules",
-            "world padel tour rules"
-        ],
-        "padel training": [
-            "padel drills",
-            "padel forehand",
-            "padel backhand",
-            "padel serve practice"
-        ],
-        # Swimming
-        "swimming styles": [
-            "swimming strokes",
-            "butterfly stroke",
-            "backstroke",
-            "breaststroke",
-            "freestyle"
-        ],
-        "swimming training": [
-            "swimming drills",
-            "swimming endurance",
-            "kickboard exercises"
-        ],
-        # Cardio
-        "cardio exercise": [
-            "aerobic exercise",
-            "endurance training",
-            "running",
-            "cycling",
-            "jump rope"
-        ],
-        # Yoga
-        "yoga": [
-            "asanas",
-            "yoga poses",
-            "yoga practice",
-            "yoga breathing",
-            "yoga styles"
-        ],
-        # Warm-up
-        "warm up": [
-            "pre-exercise warmup",
-            "dynamic stretching",
-            "mobility exercises"
-        ],
-        # Cooldown
-        "cooldown": [
-            "post-exercise cooldown",
-            "static stretching",
-            "relaxation exercises"
-        ],
-        # HIIT
-        "hiit": [
-            "high intensity interval training",
-            "interval workouts",
-            "tabata training"
-        ],
-        # Stretching
-        "stretching": [
-            "flexibility exercises",
-            "mobility drills",
-            "static stretches",
-            "dynamic stretches"
-        ],
-    }
-
-    if "football" in query.lower():
-        query = query.replace("football", "soccer (association football)")
+def _load_query_expander():
+    global _expander
+    if _expander is None:
+        _expander = QueryExpander()
+    return _expander
 
-    for key, extra_terms in expansions.items():
-        if key in query.lower():
-            return [query] + extra_terms
-
-    return [query]
+def expand_query(query: str) -> List[str]:
+    """Expand the query with the sport/exercise synonyms in data/query_expansions.json (every matching topic)."""
+    return _load_query_expander().expand(query)
 
-def retrieve_relevant_docs(query: str, vectorstore, k: int = 8) -> List[Document]:
-    """Retrieve docs with query expansion and debugging output."""
+def retrieve_relevant_docs(query: str, registry: IndexRegistry, k: int = 8) -> List[Document]:
+    """Retrieve docs from every registered index with query expansion and debugging output."""
     expanded_queries = expand_query(query)
-    all_docs = []
 
-    for q in expanded_queries:
-        docs = vectorstore.similarity_search(q, k=k)
-        all_docs.extend(docs)
+    # Expansion terms come with precomputed embeddings, so only the user's query is embedded here.
+    # The registry fans out across indexes in parallel and returns one list,
+    # already de-duplicated by page_content and ranked by normalized score.
+    query_vectors = _load_query_expander().cached_vectors(expanded_queries[1:])
+    ranked = registry.search(expanded_queries, k=k, query_vectors=query_vectors, limit=MAX_RETRIEVED_DOCS)
+    unique_docs = [doc for doc, _ in ranked]
 
-    seen = set()
-    unique_docs = []
-    for d in all_docs:
-        if d.page_content not in seen:
-            seen.add(d.page_content)
-            unique_docs.append(d)
-
-    for doc in unique_docs[:5]: 
-        print("[DEBUG] Retrieved:", doc.metadata.get("source", ""), doc.page_content[:300])
+    for doc, score in ranked[:5]:
+        print(f"[DEBUG] Retrieved ({doc.metadata.get('index')}, {score:.3f}):", doc.metadata.get("source", ""), doc.page_content[:300])
 
     return unique_docs
 
@@ -317,32 +244,19 @@ def generate_response(user_query, retrieved_docs, conv_manager):
 
 
 
-def detect_language(text):
-    try:
-        lang = detect(text)
-        return lang
-    except:
-        return "unknown"
+def resolve_query_languages(query):
+    """Return (detected_lang, answer_lang) for a query, honouring explicit answer-language requests."""
+    detected_lang, answer_lang = route_query(query)
+    print(f"[DEBUG] Detected language: {detected_lang}, answer language: {answer_lang}")
+    return detected_lang, answer_lang
 
 
-
-
-def run_rag_pipeline(query, conv_manager):
+def run_rag_pipeline(query, conv_manager, languages=None):
+    """`languages` is an already resolved (detected_lang, answer_lang) pair; it is resolved here if omitted."""
     yield json.dumps({"type": "status", "message": "Received user query..."})
 
     try:
-        desired_lang = detect_answer_language_override(query)
-        print(f"[DEBUG] Language override detected: {desired_lang}")
-
-        detected_lang = detect_language(query)
-        print(f"[DEBUG] Detected language: {detected_lang}")
-
-        if desired_lang:
-            answer_lang = desired_lang
-        elif detected_lang in ["ar", "fa", "fas", "per"]:
-            answer_lang = detected_lang
-        else:
-            answer_lang = "en"
+        detected_lang, answer_lang = languages or resolve_query_languages(query)
 
         if detected_lang == "ar":
             try:
@@ -366,32 +280,22 @@ def run_rag_pipeline(query, conv_manager):
         yield json.dumps({"type": "status", "message": "Searching vector DB..."})
 
         _load_vector_db()
-        docs = retrieve_relevant_docs(query_en, _db)
+        docs = retrieve_relevant_docs(query_en, _registry)
 
         yield json.dumps({"type": "status", "message": "Generating response..."})
         reply_en = generate_response(query_en, docs, conv_manager)
 
-        if answer_lang == "ar":
-            try:
-                yield json.dumps({"type": "status", "message": "Translating response back to Arabic..."})
-                reply_final = translate_text_fanar(reply_en, "en", "ar")
-                if reply_final.strip():
-                    reply_final = convert_bullets_to_arabic(reply_final)
-                    reply_final = make_rtl(reply_final)
-                else:
-                    reply_final = make_rtl(reply_en)
-            except Exception:
-                reply_final = make_rtl(reply_en)
-        elif answer_lang == "fa":
-            try:
-                yield json.dumps({"type": "status", "message": "Translating response back to Persian..."})
-                reply_final = translate_text_fanar(reply_en, "en", "fa")
-                if reply_final.strip():
-                    reply_final = make_rtl(reply_final)
-                else:
-                    reply_final = make_rtl(reply_en)
-            except Exception:
-                reply_final = make_rtl(reply_en)
+        if answer_lang in LANGUAGE_NAMES:
+            yield json.dumps({"type": "status", "message": f"Translating response back to {LANGUAGE_NAMES[answer_lang]}..."})
+            # Stream each bullet as soon as its translation lands; the final
+            # bot_response carries the complete answer in order.
+            translated = []
+            for index, total, segment in translate_answer_incrementally(reply_en, answer_lang):
+                if not translated:
+                    translated = [None] * total
+                translated[index] = segment
+                yield json.dumps({"type": "partial", "index": index, "total": total, "message": make_rtl(segment)})
+            reply_final = make_rtl("\n".join(translated) if translated else reply_en)
         else:
             reply_final = reply_en
 
@@ -400,20 +304,6 @@ def run_rag_pipeline(query, conv_manager):
     except Exception as e:
         yield json.dumps({"type": "error", "message": f"An error occurred: {str(e)}"})
 
-def detect_answer_language_override(text):
-    text = text.lower().strip()
-    text = text.replace("إ", "ا").replace("أ", "ا")  
-    if any(kw in text for kw in ["answer in arabic", "in arabic", "arabic", "ans in arabic", "باللغة العربيه", "اجب بالعربيه"]):
-        return "ar"
-        
-    if any(kw in text for kw in ["answer in english", "ans in english", "in english", "english", "باللغة الانجليزيه", "اجب بالانجليزيه"]):
-        return "en"
-    
-    if any(kw in text for kw in ["answer in persian", "answer in farsi", "in persian", "in farsi", "بالفارسية", "اجب بالفارسية"]):
-        return "fa"
-
-    return None
-
 
 # Usage Example:
 # from rag_core import run_rag_pipeline, ConversationManager, SYSTEM_PROMPT
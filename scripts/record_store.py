@@ -0,0 +1,57 @@
+# scripts/record_store.py
+
+import os
+import json
+import sqlite3
+
+RECORD_STORE_FILE = "records.sqlite"
+
+
+class RecordStore:
+    """
+    Keyed store for the full source records behind a FAISS index.
+
+    The index metadata only carries a short `record_id`; the original JSON items
+    live here, next to index.faiss/index.pkl, and are read back only for the
+    handful of documents a search actually returns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_index(cls, index_dir):
+        return cls(os.path.join(index_dir, RECORD_STORE_FILE))
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def write(self, records):
+        """Replace the store contents with `records`, a {record_id: json-serializable item} dict."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("DROP TABLE IF EXISTS records")
+            conn.execute("CREATE TABLE records (record_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            conn.executemany(
+                "INSERT INTO records (record_id, data) VALUES (?, ?)",
+                ((str(rid), json.dumps(item, ensure_ascii=False, separators=(",", ":"))) for rid, item in records.items()),
+            )
+        conn.close()
+
+    def get_many(self, record_ids):
+        ids = list({str(rid) for rid in record_ids})
+        if not ids or not self.exists():
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT record_id, data FROM records WHERE record_id IN ({placeholders})", ids).fetchall()
+        finally:
+            conn.close()
+        return {rid: json.loads(data) for rid, data in rows}
+
+    def get(self, record_id):
+        return self.get_many([record_id]).get(str(record_id))
@@ -0,0 +1,101 @@
+# scripts/request_coalescer.py
+
+import json
+import time
+import threading
+
+# Longest a flight may run before new callers stop joining it and its listeners give up.
+FLIGHT_TIMEOUT = 120.0
+
+
+def normalize_query(query):
+    """Lower-case and collapse whitespace so trivially different duplicates share a key."""
+    return " ".join(query.lower().split())
+
+
+class _Flight:
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.started = time.monotonic()
+        self.cond = threading.Condition()
+
+    def age(self):
+        return time.monotonic() - self.started
+
+
+class RequestCoalescer:
+    """
+    Single-flight wrapper around a streaming producer.
+
+    The first caller for a key starts the producer on a background thread; any
+    caller that arrives with the same key while that run is still in flight
+    attaches to it and receives the full event stream (replayed from the start).
+    Once the run finishes the key is released, so nothing is cached afterwards.
+
+    A flight older than `timeout` seconds is treated as hung: the next caller
+    for its key starts a fresh run, and anyone still waiting on the old one gets
+    an error event instead of blocking forever.
+    """
+
+    def __init__(self, timeout=FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def stream(self, key, producer):
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None or flight.age() >= self.timeout
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if is_leader:
+            # Run detached from the leader's response so a client disconnect
+            # does not cut off the followers attached to this flight.
+            threading.Thread(target=self._run, args=(key, flight, producer), daemon=True).start()
+        else:
+            print(f"[DEBUG] Coalesced duplicate in-flight request: {key}")
+
+        return self._follow(flight)
+
+    def _run(self, key, flight, producer):
+        try:
+            for event in producer():
+                with flight.cond:
+                    flight.events.append(event)
+                    flight.cond.notify_all()
+        except Exception as e:
+            with flight.cond:
+                flight.events.append(json.dumps({"type": "error", "message": f"An error occurred: {str(e)}"}))
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+
+    def _follow(self, flight):
+        index = 0
+        while True:
+            with flight.cond:
+                expired = False
+                while index >= len(flight.events) and not flight.done:
+                    remaining = self.timeout - flight.age()
+                    if remaining <= 0:
+                        expired = True
+                        break
+                    flight.cond.wait(remaining)
+                pending = flight.events[index:]
+                finished = flight.done
+            for event in pending:
+                yield event
+            index += len(pending)
+            if expired:
+                print(f"[WARN] Request flight timed out after {self.timeout:g}s")
+                yield json.dumps({"type": "error", "message": "The request timed out. Please try again."})
+                return
+            if finished and not pending:
+                return
@@ -0,0 +1,98 @@
+# sweep_chunking.py
+#
+# Re-chunk the cached PDF page text under several size/overlap settings, build one
+# FAISS index per setting in parallel, and report chunk count, index size, build
+# time and retrieval latency. PDFs are parsed only if they are not in page_cache/
+# yet, so repeated sweeps never re-run PyPDFLoader.
+#
+#     python sweep_chunking.py --settings 300:30,500:50,800:100,1000:150
+
+import os
+import json
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from langchain_huggingface import HuggingFaceEmbeddings
+from load_pdf import (
+    PDF_DIR, DEDUP_THRESHOLD, EMBEDDING_MODEL_NAME,
+    load_corpus_pages, make_chunks, build_index,
+)
+from scripts.chat_logs import load_logged_queries
+
+SWEEP_DIR = "sweep_indexes"
+
+
+def parse_settings(text):
+    settings = []
+    for item in text.split(","):
+        size, overlap = item.split(":")
+        settings.append((int(size), int(overlap)))
+    return settings
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def run_setting(all_docs, chunk_size, chunk_overlap, embedder, query_vectors, dedup_threshold, k):
+    index_dir = os.path.join(SWEEP_DIR, f"size{chunk_size}_overlap{chunk_overlap}")
+    chunks = make_chunks(all_docs, chunk_size, chunk_overlap, dedup_threshold)
+
+    start = time.perf_counter()
+    vectorstore = build_index(chunks, embedder, index_dir)
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        vectorstore.similarity_search_by_vector(vector, k=k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    return {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunks": len(chunks),
+        "index_bytes": dir_size(index_dir),
+        "build_s": round(build_s, 2),
+        "search_ms_p50": round(statistics.median(latencies) * 1e3, 3) if latencies else None,
+        "search_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1e3, 3) if latencies else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep chunk size/overlap over the cached PDF page text.")
+    parser.add_argument("--settings", default="300:30,500:50,800:100,1000:150",
+                        help="Comma-separated CHUNK_SIZE:CHUNK_OVERLAP pairs.")
+    parser.add_argument("--workers", type=int, default=2, help="Indexes built in parallel.")
+    parser.add_argument("--queries", type=int, default=50, help="Queries from chat_logs.jsonl used to time retrieval.")
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--no-dedup", action="store_true", help="Skip the near-duplicate pass.")
+    parser.add_argument("--report", default=os.path.join(SWEEP_DIR, "report.json"))
+    args = parser.parse_args()
+
+    settings = parse_settings(args.settings)
+    os.makedirs(SWEEP_DIR, exist_ok=True)
+
+    all_docs, _ = load_corpus_pages(PDF_DIR)
+    embedder = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    # Embed the timing queries once so latency measures only the index search.
+    query_vectors = embedder.embed_documents(load_logged_queries(limit=args.queries, unique=True))
+    dedup_threshold = None if args.no_dedup else DEDUP_THRESHOLD
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(run_setting, all_docs, size, overlap, embedder, query_vectors, dedup_threshold, args.k)
+            for size, overlap in settings
+        ]
+        results = [f.result() for f in futures]
+
+    print(f"\n{'size':>6} {'overlap':>8} {'chunks':>8} {'index MB':>9} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(f"{r['chunk_size']:>6} {r['chunk_overlap']:>8} {r['chunks']:>8} {r['index_bytes'] / 1e6:>9.2f} "
+              f"{r['build_s']:>8} {r['search_ms_p50']:>8} {r['search_ms_p95']:>8}")
+
+    with open(args.report, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Sweep report written to '{args.report}'")